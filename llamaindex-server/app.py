@@ -5,13 +5,26 @@ Supports: /v1/answer, /v1/elaborate, /v1/inject
 """
 import os
 import sys
-import json
+import asyncio
+import atexit
+import hashlib
+import io
+import queue
+import threading
+import time
 import uuid
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, Optional, List
 
-from flask import Flask, request, jsonify
+import numpy as np
+import orjson
+
+from cachetools import TTLCache
+from flask import Flask, Response, request, jsonify
 from llama_index.core import (
     VectorStoreIndex,
     StorageContext,
@@ -20,16 +33,24 @@ from llama_index.core import (
     Settings
 )
 from llama_index.embeddings.google_genai import GoogleGenAIEmbedding
-from llama_index.core.postprocessor import SimilarityPostprocessor
-from llama_index.core.schema import NodeWithScore
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
 import google.generativeai as genai
 
+from embedding_cache import CachedEmbedding
+from uring_writer import UringWriter
+from vector_stores import Int8VectorStore, MmapVectorStore, MMAP_EMBEDDINGS_FNAME
+
 app = Flask(__name__)
 
 # Global registry
 indexes: Dict[str, VectorStoreIndex] = {}  # base indexes
 delta_indexes: Dict[str, VectorStoreIndex] = {}  # injected content indexes
 threads: Dict[str, List[Dict]] = {}  # thread_slug -> [messages]
+indexes_lock = threading.Lock()  # guards registry writes during parallel load
+seen_hashes: Dict[str, set] = {}  # slug -> hashes of already-injected content
+seen_hashes_lock = threading.Lock()
+dirty_slugs: set = set()  # delta slugs with unpersisted changes
+dirty_slugs_lock = threading.Lock()
 
 # Configuration from environment
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
@@ -39,6 +60,9 @@ DELTA_ROOT = os.environ.get("DELTA_ROOT", "/app/storage-delta")
 STATE_ROOT = os.environ.get("STATE_ROOT", "/app/state")
 INJECT_ROOT = os.environ.get("INJECT_ROOT", "/app/injected")
 
+# Precomputed thread-memory directory, so request paths don't rebuild it
+THREADS_DIR = Path(STATE_ROOT) / "threads"
+
 # Abstention configuration (lowered defaults for better recall)
 MIN_HITS = int(os.environ.get("MIN_HITS", "1"))
 SIMILARITY_CUTOFF = float(os.environ.get("SIMILARITY_CUTOFF", "0.5"))
@@ -46,9 +70,65 @@ CONFIDENCE_THRESHOLD = float(os.environ.get("CONFIDENCE_THRESHOLD", "0.1"))
 TOP_K = int(os.environ.get("TOP_K", "5"))
 TEMPERATURE = float(os.environ.get("TEMPERATURE", "0.0"))
 
+# Startup index loading parallelism
+INDEX_LOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Injection batching configuration
+INJECT_MAX_BATCH = int(os.environ.get("INJECT_MAX_BATCH", "32"))
+INJECT_FLUSH_INTERVAL_MS = int(os.environ.get("INJECT_FLUSH_INTERVAL_MS", "200"))
+
+# Seconds between debounced delta-index persists
+PERSIST_INTERVAL = float(os.environ.get("PERSIST_INTERVAL", "2.0"))
+
+# Startup warmup: comma-separated FAQ queries to pre-embed, plus an optional
+# one-token Gemini ping to establish the HTTPS connection pool
+WARMUP_QUERIES = [q.strip() for q in os.environ.get("WARMUP_QUERIES", "").split(",") if q.strip()]
+WARMUP_GEMINI_PING = os.environ.get("WARMUP_GEMINI_PING", "1") == "1"
+
+# Answer cache configuration
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "2048"))
+ANSWER_CACHE_TTL = int(os.environ.get("ANSWER_CACHE_TTL", "3600"))
+
+# Cache of generated answers keyed by (slug, normalized message digest).
+# TTL-bounded so repeated FAQ-style questions skip retrieval and Gemini
+# entirely while still picking up freshly injected content within the hour.
+answer_cache: TTLCache = TTLCache(maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL)
+answer_cache_lock = threading.Lock()
+
+# Static RAG system preamble. Kept as one block so it can be registered as
+# explicit Gemini cached content and referenced by handle instead of being
+# re-sent (and re-prefilled) on every request.
+RAG_SYSTEM_PREAMBLE = """You are a helpful technical assistant with expertise in Kubernetes and cloud-native technologies.
+
+Use the provided context as your PRIMARY source of information. When the user asks for examples or configurations:
+1. Start with what's provided in the context
+2. Use your knowledge to complete and enhance the example to make it fully functional
+3. Ensure all parts of your example are consistent (matching labels, IPs, names, etc.)
+4. Provide complete, working configurations that the user can directly use
+
+If the context doesn't contain relevant information to answer the question at all, respond with: "I don't know."
+"""
+
+CONTEXT_CACHE_TTL = int(os.environ.get("CONTEXT_CACHE_TTL", "3600"))
+
+# Gemini explicit caching enforces a minimum cacheable size (4096 tokens on
+# current models, ~4 chars/token). Below that, CachedContent.create is doomed
+# to fail, so skip the API call and use the plain-prompt path until the
+# preamble grows past the threshold.
+CONTEXT_CACHE_MIN_CHARS = int(os.environ.get("CONTEXT_CACHE_MIN_CHARS", str(4096 * 4)))
+
 # Gemini model for chat (initialize once)
 gemini_model = None
 
+# Gemini model bound to the cached RAG preamble (explicit context caching)
+rag_cached_model = None
+rag_context_cache = None
+rag_cache_unavailable = False
+rag_cache_lock = threading.Lock()
+
+# Write-behind writer for thread memory and injection JSONL
+uring_writer = UringWriter()
+
 
 def get_gemini_model():
     """Lazy initialize Gemini model to avoid startup validation issues."""
@@ -60,84 +140,227 @@ def get_gemini_model():
     return gemini_model
 
 
+def _schedule_context_cache_refresh():
+    """Refresh the cached-content TTL on a background timer before it expires."""
+    def _refresh():
+        try:
+            rag_context_cache.update(ttl=timedelta(seconds=CONTEXT_CACHE_TTL))
+        except Exception as e:
+            print(f"Warning: Could not refresh Gemini context cache TTL: {e}")
+        _schedule_context_cache_refresh()
+
+    timer = threading.Timer(CONTEXT_CACHE_TTL * 0.8, _refresh)
+    timer.daemon = True
+    timer.start()
+
+
+def get_rag_model():
+    """Return a Gemini model bound to the cached RAG preamble, or None.
+
+    With explicit context caching the static system preamble is uploaded once
+    and referenced by handle, so each /v1/answer request only sends (and pays
+    prefill for) the dynamic context + question tail. Falls back to None when
+    caching is unavailable (e.g. preamble below the minimum cacheable size).
+    """
+    global rag_cached_model, rag_context_cache, rag_cache_unavailable
+    with rag_cache_lock:
+        if rag_cached_model is None and not rag_cache_unavailable:
+            if len(RAG_SYSTEM_PREAMBLE) < CONTEXT_CACHE_MIN_CHARS:
+                print("Gemini context caching skipped: preamble below the "
+                      "minimum cacheable size, using plain prompts")
+                rag_cache_unavailable = True
+                return None
+            try:
+                genai.configure(api_key=GEMINI_API_KEY)
+                rag_context_cache = genai.caching.CachedContent.create(
+                    model='models/gemini-2.5-pro',
+                    system_instruction=RAG_SYSTEM_PREAMBLE,
+                    ttl=timedelta(seconds=CONTEXT_CACHE_TTL),
+                )
+                rag_cached_model = genai.GenerativeModel.from_cached_content(rag_context_cache)
+                _schedule_context_cache_refresh()
+                print(f"Created Gemini context cache: {rag_context_cache.name}")
+            except Exception as e:
+                print(f"Warning: Gemini context caching unavailable, sending full prompts: {e}")
+                rag_cache_unavailable = True
+        return rag_cached_model
+
+
 def normalize_version(version):
     """Replace dots with -dot- for slug naming."""
     return version.replace(".", "-dot-")
 
 
+@lru_cache(maxsize=1024)
 def get_slug(project, version):
-    """Generate slug for project/version."""
+    """Generate slug for project/version (memoized - called on every request)."""
     if version:
         return f"{project}-{normalize_version(version)}"
     return project
 
 
+def content_hash(text: str) -> bytes:
+    """Digest used to deduplicate injected content per slug."""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _indexed_injection_ids(delta_index: VectorStoreIndex) -> set:
+    """Collect JSONL record ids present in a delta index's docstore.
+
+    Batched injections insert whole TextNodes whose node id is the record
+    id; indexes built via from_documents chunk each record, leaving the
+    record id as the chunks' ref_doc_id - so check both.
+    """
+    docstore = delta_index.docstore
+    record_ids = set(docstore.docs.keys())
+    record_ids.update(docstore.get_all_ref_doc_info() or {})
+    return record_ids
+
+
+def reconcile_injected_content():
+    """Seed dedup hashes from the JSONL logs and re-enqueue lost records.
+
+    The JSONL append lands ahead of the debounced delta persist, so after a
+    hard crash (e.g. an OOM kill) the persisted delta index can lag the log.
+    Any logged record missing from its loaded delta index is re-enqueued
+    through the injection batcher; seeding the hash alone would make every
+    retry of that content a "duplicate" that never gets indexed.
+    """
+    inject_root = Path(INJECT_ROOT)
+    if not inject_root.exists():
+        return
+    for project_dir in inject_root.iterdir():
+        if not project_dir.is_dir():
+            continue
+        for version_dir in project_dir.iterdir():
+            if not version_dir.is_dir():
+                continue
+            slug = f"{project_dir.name}-{version_dir.name}"
+            hashes = seen_hashes.setdefault(slug, set())
+            delta_index = delta_indexes.get(slug)
+            # Without a loaded delta index the JSONL itself is what the lazy
+            # build reads, so every logged record is still reachable
+            indexed_ids = _indexed_injection_ids(delta_index) if delta_index else None
+            requeued = 0
+            for jsonl_file in sorted(version_dir.glob("*.jsonl")):
+                with open(jsonl_file, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        record = orjson.loads(line)
+                        hashes.add(content_hash(record["text"]))
+                        record_id = record.get("id")
+                        if (indexed_ids is None or record_id is None
+                                or record_id in indexed_ids):
+                            continue
+                        injection_batcher.enqueue(slug, Document(
+                            text=record["text"],
+                            metadata=record.get("metadata", {}),
+                            doc_id=record_id,
+                        ))
+                        requeued += 1
+            if requeued:
+                print(f"Re-enqueued {requeued} logged injections missing "
+                      f"from delta index {slug}")
+
+
+def answer_cache_key(slug: str, message: str) -> tuple:
+    """Cache key for an answer: slug plus digest of the normalized question."""
+    digest = hashlib.sha256(message.strip().lower().encode()).digest()
+    return (slug, digest)
+
+
 def load_thread_memory(thread_slug: str) -> List[Dict]:
-    """Load thread conversation history from disk."""
-    thread_path = Path(STATE_ROOT) / "threads" / f"{thread_slug}.json"
+    """Load thread conversation history, preferring the in-memory copy.
+
+    The `threads` cache is authoritative; disk is an append-only JSONL log
+    that is parsed once per thread per process. Legacy `.json` array files
+    are migrated to the log format on first access.
+    """
+    if thread_slug in threads:
+        return threads[thread_slug]
+
+    messages: List[Dict] = []
+    thread_path = THREADS_DIR / f"{thread_slug}.jsonl"
+    legacy_path = THREADS_DIR / f"{thread_slug}.json"
     if thread_path.exists():
-        with open(thread_path, 'r') as f:
-            return json.load(f)
-    return []
+        with open(thread_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    messages.append(orjson.loads(line))
+    elif legacy_path.exists():
+        with open(legacy_path, 'rb') as f:
+            messages = orjson.loads(f.read())
+        if messages:
+            uring_writer.write(
+                thread_path,
+                b''.join(orjson.dumps(m) + b'\n' for m in messages)
+            )
+
+    threads[thread_slug] = messages
+    return messages
+
 
+def append_thread_messages(thread_slug: str, new_messages: List[Dict]):
+    """Append messages to the in-memory thread and its on-disk JSONL log.
 
-def save_thread_memory(thread_slug: str, messages: List[Dict]):
-    """Persist thread conversation history to disk."""
-    thread_dir = Path(STATE_ROOT) / "threads"
-    thread_dir.mkdir(parents=True, exist_ok=True)
-    thread_path = thread_dir / f"{thread_slug}.json"
-    with open(thread_path, 'w') as f:
-        json.dump(messages, f, indent=2)
+    Only the new lines are written, so the per-message cost stays O(1)
+    instead of re-serializing the whole history every turn.
+    """
+    thread_messages = load_thread_memory(thread_slug)
+    thread_messages.extend(new_messages)
+    thread_path = THREADS_DIR / f"{thread_slug}.jsonl"
+    payload = b''.join(orjson.dumps(m) + b'\n' for m in new_messages)
+    uring_writer.write(thread_path, payload, append=True)
 
 
 def append_to_jsonl(project: str, version: str, text: str, metadata: Optional[Dict] = None):
     """Append injection to JSONL file."""
     inject_dir = Path(INJECT_ROOT) / project / normalize_version(version)
-    inject_dir.mkdir(parents=True, exist_ok=True)
-    
+
     today = datetime.now().strftime("%Y-%m-%d")
     jsonl_path = inject_dir / f"{today}.jsonl"
-    
+
     record = {
         "id": str(uuid.uuid4()),
         "timestamp": datetime.now().isoformat(),
         "text": text,
         "metadata": metadata or {}
     }
-    
-    with open(jsonl_path, 'a') as f:
-        f.write(json.dumps(record) + '\n')
 
+    uring_writer.write(jsonl_path, orjson.dumps(record) + b'\n', append=True)
 
-def load_injected_documents(project: str, version: str) -> List[Document]:
-    """Load all injected documents from JSONL files for a project/version."""
+
+def iter_injected_documents(project: str, version: str) -> Iterator[Document]:
+    """Stream injected documents from JSONL files for a project/version."""
     inject_dir = Path(INJECT_ROOT) / project / normalize_version(version)
     if not inject_dir.exists():
-        return []
-    
-    documents = []
+        return
+
     for jsonl_file in inject_dir.glob("*.jsonl"):
-        with open(jsonl_file, 'r') as f:
+        with open(jsonl_file, 'rb') as f:
             for line in f:
                 if line.strip():
-                    record = json.loads(line)
-                    doc = Document(
+                    record = orjson.loads(line)
+                    yield Document(
                         text=record["text"],
                         metadata=record.get("metadata", {}),
                         doc_id=record.get("id")
                     )
-                    documents.append(doc)
-    return documents
 
 
 def load_or_create_delta_index(slug: str) -> Optional[VectorStoreIndex]:
     """Load or create delta index for a project/version slug."""
     delta_path = Path(DELTA_ROOT) / slug
     
-    # Try loading existing persisted delta index
+    # Try loading existing persisted delta index (quantized vector store;
+    # legacy float stores are re-quantized on first scan)
     if delta_path.exists():
         try:
-            storage_context = StorageContext.from_defaults(persist_dir=str(delta_path))
+            storage_context = StorageContext.from_defaults(
+                persist_dir=str(delta_path),
+                vector_store=Int8VectorStore.from_persist_dir(str(delta_path)),
+            )
             return load_index_from_storage(storage_context)
         except Exception as e:
             print(f"Warning: Could not load delta index from {delta_path}: {e}")
@@ -145,11 +368,15 @@ def load_or_create_delta_index(slug: str) -> Optional[VectorStoreIndex]:
     # Try building from JSONL if available
     project, version_slug = slug.split("-", 1)
     version = version_slug.replace("-dot-", ".")
-    documents = load_injected_documents(project, version)
-    
+    # Materialize the stream exactly once, for from_documents and the count
+    documents = list(iter_injected_documents(project, version))
+
     if documents:
         print(f"Building delta index for {slug} from {len(documents)} injected documents")
-        index = VectorStoreIndex.from_documents(documents)
+        index = VectorStoreIndex.from_documents(
+            documents,
+            storage_context=StorageContext.from_defaults(vector_store=Int8VectorStore()),
+        )
         delta_path.mkdir(parents=True, exist_ok=True)
         index.storage_context.persist(persist_dir=str(delta_path))
         return index
@@ -157,66 +384,270 @@ def load_or_create_delta_index(slug: str) -> Optional[VectorStoreIndex]:
     return None
 
 
-def retrieve_with_confidence(base_index: VectorStoreIndex, 
+def _persist_delta_index(slug: str):
+    """Write one delta index's full storage context to disk."""
+    delta_index = delta_indexes.get(slug)
+    if delta_index is None:
+        return
+    delta_path = Path(DELTA_ROOT) / slug
+    delta_path.mkdir(parents=True, exist_ok=True)
+    delta_index.storage_context.persist(persist_dir=str(delta_path))
+    print(f"Persisted delta index: {slug}")
+
+
+def _drain_on_shutdown():
+    """Flush queued write-behind I/O, then persist dirty delta indexes.
+
+    Thread-memory and JSONL appends sit in the writer's queue; without the
+    flush they would be silently lost when the daemon worker dies at exit.
+    """
+    try:
+        uring_writer.flush()
+    except Exception as e:
+        print(f"Warning: could not flush pending writes on shutdown: {e}")
+    drain_dirty_slugs()
+
+
+def drain_dirty_slugs():
+    """Persist every delta index with unpersisted changes."""
+    with dirty_slugs_lock:
+        pending = set(dirty_slugs)
+        dirty_slugs.clear()
+    for slug in pending:
+        try:
+            _persist_delta_index(slug)
+        except Exception as e:
+            print(f"Warning: could not persist delta index {slug}: {e}")
+
+
+_persist_scheduler: Optional[threading.Thread] = None
+_persist_scheduler_lock = threading.Lock()
+
+
+def start_persist_scheduler():
+    """Start the debounced delta-persist thread (idempotent)."""
+    global _persist_scheduler
+
+    def _loop():
+        while True:
+            time.sleep(PERSIST_INTERVAL)
+            drain_dirty_slugs()
+
+    with _persist_scheduler_lock:
+        if _persist_scheduler is None or not _persist_scheduler.is_alive():
+            _persist_scheduler = threading.Thread(target=_loop, daemon=True)
+            _persist_scheduler.start()
+
+
+def mark_delta_dirty(slug: str):
+    """Schedule a debounced persist for the slug's delta index.
+
+    A persist rewrites the docstore, index store and vector store files from
+    scratch, so a burst of K injects coalesces into a single rewrite instead
+    of K of them.
+    """
+    start_persist_scheduler()
+    with dirty_slugs_lock:
+        dirty_slugs.add(slug)
+
+
+class InjectionBatcher:
+    """
+    Batches injected documents so a burst of /v1/inject calls costs one
+    embedding round-trip and one index persist per slug per flush, instead
+    of one of each per call.
+    """
+
+    def __init__(self, max_batch: int = INJECT_MAX_BATCH,
+                 flush_interval_ms: int = INJECT_FLUSH_INTERVAL_MS):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._queue: "queue.Queue[tuple[str, Document]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background worker thread (idempotent)."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def enqueue(self, slug: str, doc: Document):
+        """Queue a document for batched embedding and indexing."""
+        self.start()
+        self._queue.put((slug, doc))
+
+    def _run(self):
+        while True:
+            # Block for the first item, then drain up to max_batch within the flush window
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get(timeout=self.flush_interval))
+                except queue.Empty:
+                    break
+            try:
+                self._flush(batch)
+            except Exception as e:
+                print(f"Warning: injection batch flush failed: {e}")
+
+    def _flush(self, batch: List[tuple]):
+        # Group by slug so each slug gets one embedding call and one persist
+        by_slug: Dict[str, List[Document]] = {}
+        for slug, doc in batch:
+            by_slug.setdefault(slug, []).append(doc)
+
+        for slug, docs in by_slug.items():
+            try:
+                self._flush_slug(slug, docs)
+            except Exception as e:
+                # The client already got a 202 and the JSONL record exists, so
+                # un-register the dedup hashes - otherwise a retry of the same
+                # content would be rejected as a duplicate forever while the
+                # documents never made it into the delta index
+                with seen_hashes_lock:
+                    slug_hashes = seen_hashes.get(slug)
+                    if slug_hashes:
+                        for doc in docs:
+                            slug_hashes.discard(content_hash(doc.text))
+                print(f"Warning: injection flush failed for {slug}, "
+                      f"dropped {len(docs)} documents (dedup hashes cleared for retry): {e}")
+
+    def _flush_slug(self, slug: str, docs: List[Document]):
+        embeddings = Settings.embed_model.get_text_embedding_batch(
+            [doc.text for doc in docs]
+        )
+        nodes = [
+            TextNode(
+                text=doc.text,
+                metadata=doc.metadata,
+                id_=doc.doc_id,
+                embedding=embedding,
+            )
+            for doc, embedding in zip(docs, embeddings)
+        ]
+
+        delta_index = delta_indexes.get(slug)
+        if delta_index is None:
+            delta_index = VectorStoreIndex(
+                nodes=[],
+                storage_context=StorageContext.from_defaults(vector_store=Int8VectorStore()),
+            )
+            delta_indexes[slug] = delta_index
+            refresh_health()
+
+        # Pre-filled embeddings mean insert_nodes skips per-node embedding
+        delta_index.insert_nodes(nodes)
+        mark_delta_dirty(slug)
+        print(f"Flushed {len(nodes)} injected documents into delta index {slug}")
+
+
+injection_batcher = InjectionBatcher()
+
+
+async def _retrieve_concurrently(base_index: VectorStoreIndex,
+                                 delta_index: Optional[VectorStoreIndex],
+                                 query: str) -> List[NodeWithScore]:
+    """Run base and delta retrieval concurrently, embedding the query once.
+
+    The query embedding is identical for both retrievers, so it is computed
+    a single time and passed via QueryBundle; the two vector searches then
+    overlap instead of paying two serial embed+search round-trips.
+    """
+    embedding = await Settings.embed_model.aget_query_embedding(query)
+    query_bundle = QueryBundle(query_str=query, embedding=embedding)
+
+    tasks = [base_index.as_retriever(similarity_top_k=TOP_K).aretrieve(query_bundle)]
+    if delta_index:
+        tasks.append(delta_index.as_retriever(similarity_top_k=TOP_K).aretrieve(query_bundle))
+    results = await asyncio.gather(*tasks)
+
+    all_nodes = list(results[0])
+    print(f"Retrieved {len(results[0])} nodes from base index")
+    if delta_index:
+        all_nodes.extend(results[1])
+        print(f"Retrieved {len(results[1])} nodes from delta index")
+    return all_nodes
+
+
+def retrieve_with_confidence(base_index: VectorStoreIndex,
                               delta_index: Optional[VectorStoreIndex],
                               query: str) -> tuple[List[NodeWithScore], bool]:
     """
     Retrieve nodes and determine if we have sufficient confidence to answer.
     Returns (nodes, should_answer).
     """
-    all_nodes = []
-    
-    # Retrieve from base index
-    base_retriever = base_index.as_retriever(similarity_top_k=TOP_K)
-    base_nodes = base_retriever.retrieve(query)
-    all_nodes.extend(base_nodes)
-    print(f"Retrieved {len(base_nodes)} nodes from base index")
-    
-    # Retrieve from delta index if available
-    if delta_index:
-        delta_retriever = delta_index.as_retriever(similarity_top_k=TOP_K)
-        delta_nodes = delta_retriever.retrieve(query)
-        all_nodes.extend(delta_nodes)
-        print(f"Retrieved {len(delta_nodes)} nodes from delta index")
-    
+    # Flask handlers run in plain threads with no event loop, so drive the
+    # concurrent retrieval with asyncio.run here
+    all_nodes = asyncio.run(_retrieve_concurrently(base_index, delta_index, query))
+
+    # Single vectorized pass over scores: debug dump, similarity cutoff and
+    # mean confidence all come from one NumPy array instead of three Python
+    # loops over node attributes
+    scores = np.fromiter((node.score or 0.0 for node in all_nodes),
+                         dtype=np.float32, count=len(all_nodes))
+
     # Debug: print scores before filtering
     if all_nodes:
-        scores = [f"{node.score:.3f}" for node in all_nodes if node.score is not None]
-        print(f"Scores before filtering: {scores}")
-    
+        print(f"Scores before filtering: {[f'{score:.3f}' for score in scores.tolist()]}")
+
     # Apply similarity cutoff
-    postprocessor = SimilarityPostprocessor(similarity_cutoff=SIMILARITY_CUTOFF)
-    filtered_nodes = postprocessor.postprocess_nodes(all_nodes)
+    mask = scores >= SIMILARITY_CUTOFF
+    filtered_nodes = [node for node, keep in zip(all_nodes, mask.tolist()) if keep]
     print(f"After similarity cutoff ({SIMILARITY_CUTOFF}): {len(filtered_nodes)} nodes")
-    
+
     # Check abstention conditions
     if len(filtered_nodes) < MIN_HITS:
         print(f"Abstaining: fewer than {MIN_HITS} hits")
         return filtered_nodes, False
-    
+
     # Calculate aggregate confidence (mean of scores)
     if filtered_nodes:
-        scores = [node.score for node in filtered_nodes if node.score is not None]
-        if scores:
-            mean_score = sum(scores) / len(scores)
-            print(f"Mean confidence score: {mean_score:.3f} (threshold: {CONFIDENCE_THRESHOLD})")
-            if mean_score < CONFIDENCE_THRESHOLD:
-                print(f"Abstaining: confidence below threshold")
-                return filtered_nodes, False
-    
+        mean_score = float(scores[mask].mean())
+        print(f"Mean confidence score: {mean_score:.3f} (threshold: {CONFIDENCE_THRESHOLD})")
+        if mean_score < CONFIDENCE_THRESHOLD:
+            print(f"Abstaining: confidence below threshold")
+            return filtered_nodes, False
+
     print(f"Proceeding with answer using {len(filtered_nodes)} nodes")
     return filtered_nodes, True
 
 
-def generate_with_gemini(prompt: str) -> str:
-    """Generate response using Gemini model."""
-    model = get_gemini_model()
-    response = model.generate_content(
-        prompt,
-        generation_config=genai.types.GenerationConfig(
-            temperature=TEMPERATURE,
-        )
+def _reset_rag_cache():
+    """Drop the cached-content handle so the next call recreates it."""
+    global rag_cached_model, rag_context_cache
+    with rag_cache_lock:
+        rag_cached_model = None
+        rag_context_cache = None
+
+
+def generate_with_gemini(prompt: str, use_context_cache: bool = False) -> str:
+    """Generate response using Gemini model.
+
+    With use_context_cache, `prompt` is only the dynamic tail and the static
+    RAG preamble is referenced via cached content; if the cache is unavailable
+    (or generation against it fails, e.g. the CachedContent expired
+    server-side) the preamble is prepended and the full prompt sent as before.
+    """
+    generation_config = genai.types.GenerationConfig(
+        temperature=TEMPERATURE,
     )
+
+    if use_context_cache:
+        model = get_rag_model()
+        if model is not None:
+            try:
+                response = model.generate_content(prompt, generation_config=generation_config)
+                return response.text
+            except Exception as e:
+                print(f"Warning: cached-content generation failed, "
+                      f"falling back to plain prompt: {e}")
+                _reset_rag_cache()
+        prompt = f"{RAG_SYSTEM_PREAMBLE}\n{prompt}"
+
+    model = get_gemini_model()
+    response = model.generate_content(prompt, generation_config=generation_config)
     return response.text
 
 
@@ -231,20 +662,39 @@ def build_indexes_if_needed():
     if not existing_indexes and data_path.exists():
         print("No indexes found - building from rag-data on first startup...")
         print("This may take a few minutes depending on the amount of data.")
-        
-        # Import and run build_indexes
-        import subprocess
-        result = subprocess.run(
-            ["python", "build_indexes.py", "--data", DATA_ROOT, "--out", STORAGE_ROOT],
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
-            print(f"Error building indexes: {result.stderr}")
-        else:
+
+        # Build in-process: no second interpreter re-importing llama_index,
+        # logs stream live, and the already-configured embed model is reused
+        from build_indexes import build_indexes as build_base_indexes
+        try:
+            build_base_indexes(DATA_ROOT, STORAGE_ROOT, configure_embeddings=False)
             print("Indexes built successfully!")
-            print(result.stdout)
+        except Exception as e:
+            print(f"Error building indexes: {e}")
+
+
+def warm_up_clients():
+    """Prime the Gemini embedding and generation clients before real traffic.
+
+    The first call to each endpoint otherwise pays TCP+TLS handshake and
+    connection-pool setup (100-300ms) on a live user request. Pre-embedding
+    the configured WARMUP_QUERIES also seeds the query-embedding cache for
+    known FAQ questions.
+    """
+    try:
+        Settings.embed_model.get_query_embedding("warmup")
+        for query in WARMUP_QUERIES:
+            Settings.embed_model.get_query_embedding(query)
+        if WARMUP_QUERIES:
+            print(f"Prefetched embeddings for {len(WARMUP_QUERIES)} warmup queries")
+    except Exception as e:
+        print(f"Warning: embedding warmup failed: {e}")
+
+    if WARMUP_GEMINI_PING:
+        try:
+            generate_with_gemini("ping")
+        except Exception as e:
+            print(f"Warning: Gemini warmup ping failed: {e}")
 
 
 def initialize_server():
@@ -253,11 +703,16 @@ def initialize_server():
         print("Error: GEMINI_API_KEY environment variable is required")
         sys.exit(1)
     
-    # Configure embeddings (we use this, not the LLM class)
-    Settings.embed_model = GoogleGenAIEmbedding(
+    # Configure embeddings (we use this, not the LLM class), with a
+    # query-embedding cache in front so retried/repeated questions skip
+    # the Gemini embedding round-trip. embed_batch_size=100 matches the
+    # standalone build script so in-process first-boot builds and batched
+    # injections pack 100 texts per Gemini call
+    Settings.embed_model = CachedEmbedding(GoogleGenAIEmbedding(
         model_name="models/text-embedding-004",
-        api_key=GEMINI_API_KEY
-    )
+        api_key=GEMINI_API_KEY,
+        embed_batch_size=100
+    ))
     
     # Create necessary directories
     for dir_path in [STORAGE_ROOT, DELTA_ROOT, STATE_ROOT, INJECT_ROOT]:
@@ -265,39 +720,98 @@ def initialize_server():
     
     # Build indexes if they don't exist (first startup)
     build_indexes_if_needed()
-    
-    # Load base indexes
+
+    # Load base and delta indexes in parallel - each load is dominated by
+    # reading and parsing the persisted JSON stores, so startup becomes
+    # max(load_time) instead of sum(load_time)
     storage_path = Path(STORAGE_ROOT)
-    if storage_path.exists():
-        for index_dir in storage_path.iterdir():
-            if index_dir.is_dir():
-                slug = index_dir.name
-                try:
-                    storage_context = StorageContext.from_defaults(persist_dir=str(index_dir))
-                    index = load_index_from_storage(storage_context)
-                    indexes[slug] = index
-                    print(f"Loaded base index: {slug}")
-                except Exception as e:
-                    print(f"Warning: Could not load index {slug}: {e}")
-    
-    # Load delta indexes
+    base_dirs = [d for d in storage_path.iterdir() if d.is_dir()] if storage_path.exists() else []
     delta_path = Path(DELTA_ROOT)
-    if delta_path.exists():
-        for index_dir in delta_path.iterdir():
-            if index_dir.is_dir():
-                slug = index_dir.name
-                delta_index = load_or_create_delta_index(slug)
-                if delta_index:
-                    delta_indexes[slug] = delta_index
-                    print(f"Loaded delta index: {slug}")
-    
+    delta_dirs = [d for d in delta_path.iterdir() if d.is_dir()] if delta_path.exists() else []
+
+    def _load_base(index_dir: Path):
+        slug = index_dir.name
+        try:
+            if (index_dir / MMAP_EMBEDDINGS_FNAME).exists():
+                # Binary format: vectors come up as a zero-copy memory map
+                storage_context = StorageContext.from_defaults(
+                    persist_dir=str(index_dir),
+                    vector_store=MmapVectorStore.from_persist_dir(str(index_dir)),
+                )
+            else:
+                # Legacy JSON vector store
+                storage_context = StorageContext.from_defaults(persist_dir=str(index_dir))
+            index = load_index_from_storage(storage_context)
+        except Exception as e:
+            print(f"Warning: Could not load index {slug}: {e}")
+            return
+        with indexes_lock:
+            indexes[slug] = index
+        refresh_health()
+        print(f"Loaded base index: {slug}")
+
+    def _load_delta(index_dir: Path):
+        slug = index_dir.name
+        delta_index = load_or_create_delta_index(slug)
+        if delta_index:
+            with indexes_lock:
+                delta_indexes[slug] = delta_index
+            refresh_health()
+            print(f"Loaded delta index: {slug}")
+
+    if base_dirs or delta_dirs:
+        with ThreadPoolExecutor(max_workers=INDEX_LOAD_WORKERS) as executor:
+            futures = [executor.submit(_load_base, d) for d in base_dirs]
+            futures += [executor.submit(_load_delta, d) for d in delta_dirs]
+            for future in as_completed(futures):
+                future.result()
+
+    # Seed injection dedup hashes and re-enqueue any JSONL records a hard
+    # crash left out of the persisted delta indexes (needs the indexes loaded)
+    reconcile_injected_content()
+
+    # Start the background injection batcher and debounced persist scheduler
+    injection_batcher.start()
+    start_persist_scheduler()
+
+    # Drain unpersisted state on shutdown. atexit fires on normal interpreter
+    # exit in both the dev server and gunicorn workers; installing our own
+    # SIGTERM handler here would clobber gunicorn's worker handler and abort
+    # in-flight requests instead of letting graceful shutdown finish them.
+    atexit.register(_drain_on_shutdown)
+
+    # Register the static RAG preamble as Gemini cached content up front
+    get_rag_model()
+
+    # Warm the Gemini HTTPS pools and pre-embed configured FAQ queries
+    warm_up_clients()
+
+    refresh_health()
     print(f"Server initialized with {len(indexes)} base indexes and {len(delta_indexes)} delta indexes")
 
 
+# Precomputed /health payload - kubelet probes hit this endpoint at 1Hz per
+# pod, so the response is rebuilt only when the index registries change
+_health_bytes = b''
+
+
+def refresh_health():
+    """Recompute the static /health payload after a registry change."""
+    global _health_bytes
+    _health_bytes = orjson.dumps({
+        "status": "ok",
+        "base_indexes": len(indexes),
+        "delta_indexes": len(delta_indexes),
+    })
+
+
+refresh_health()
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
-    return jsonify({"status": "ok", "base_indexes": len(indexes), "delta_indexes": len(delta_indexes)})
+    return Response(_health_bytes, mimetype='application/json')
 
 
 @app.route('/v1/answer', methods=['POST'])
@@ -307,60 +821,66 @@ def answer():
     Body: { project, version, thread_slug, message }
     Returns: { textResponse }
     """
-    data = request.json
-    project = data.get('project')
-    version = data.get('version')
-    thread_slug = data.get('thread_slug')
-    message = data.get('message')
-    
-    if not all([project, version, thread_slug, message]):
+    data = request.get_json(cache=True, silent=True) or {}
+    try:
+        project, version, thread_slug, message = itemgetter(
+            'project', 'version', 'thread_slug', 'message')(data)
+    except (KeyError, TypeError):
         return jsonify({"error": "Missing required fields"}), 400
-    
+    if not (project and version and thread_slug and message):
+        return jsonify({"error": "Missing required fields"}), 400
+
     slug = get_slug(project, version)
-    
+
     # Get indexes
     base_index = indexes.get(slug)
     if not base_index:
         return jsonify({"error": f"No index found for {project}/{version}"}), 404
     
     delta_index = delta_indexes.get(slug)
-    
-    # Retrieve with confidence gating
-    nodes, should_answer = retrieve_with_confidence(base_index, delta_index, message)
-    
-    if not should_answer:
-        response_text = "I don't know."
-    else:
-        # Build context from nodes
-        context = "\n\n".join([node.node.get_content() for node in nodes])
-        
-        # Generate response with Gemini directly
-        prompt = f"""You are a helpful technical assistant with expertise in Kubernetes and cloud-native technologies.
-
-Use the provided context as your PRIMARY source of information. When the user asks for examples or configurations:
-1. Start with what's provided in the context
-2. Use your knowledge to complete and enhance the example to make it fully functional
-3. Ensure all parts of your example are consistent (matching labels, IPs, names, etc.)
-4. Provide complete, working configurations that the user can directly use
 
-If the context doesn't contain relevant information to answer the question at all, respond with: "I don't know."
+    # Serve repeated questions straight from the answer cache
+    cache_key = answer_cache_key(slug, message)
+    with answer_cache_lock:
+        cached_response = answer_cache.get(cache_key)
 
-Context:
-{context}
+    if cached_response is not None:
+        print(f"Answer cache hit for {slug}")
+        response_text = cached_response
+    else:
+        # Retrieve with confidence gating
+        nodes, should_answer = retrieve_with_confidence(base_index, delta_index, message)
 
-Question: {message}
+        if not should_answer:
+            response_text = "I don't know."
+        else:
+            # Stream the prompt into a single buffer - no intermediate list
+            # of node contents and no doubled allocation from joining the
+            # context and then copying it into an f-string. Only the dynamic
+            # tail is built here; the static preamble rides the context cache.
+            buf = io.StringIO()
+            buf.write("Context:\n")
+            for i, node in enumerate(nodes):
+                if i:
+                    buf.write("\n\n")
+                buf.write(node.node.get_content())
+            buf.write("\n\nQuestion: ")
+            buf.write(message)
+            buf.write("\n\nAnswer:")
+            prompt = buf.getvalue()
+
+            response_text = generate_with_gemini(prompt, use_context_cache=True)
+
+            # Only cache real answers - abstentions should retry retrieval
+            with answer_cache_lock:
+                answer_cache[cache_key] = response_text
+
+    # Update thread memory (append-only)
+    append_thread_messages(thread_slug, [
+        {"role": "user", "content": message},
+        {"role": "assistant", "content": response_text},
+    ])
 
-Answer:"""
-        
-        response_text = generate_with_gemini(prompt)
-    
-    # Update thread memory
-    thread_messages = load_thread_memory(thread_slug)
-    thread_messages.append({"role": "user", "content": message})
-    thread_messages.append({"role": "assistant", "content": response_text})
-    save_thread_memory(thread_slug, thread_messages)
-    threads[thread_slug] = thread_messages
-    
     return jsonify({"textResponse": response_text})
 
 
@@ -372,11 +892,12 @@ def elaborate():
     Body: { thread_slug, message }
     Returns: { textResponse }
     """
-    data = request.json
-    thread_slug = data.get('thread_slug')
-    message = data.get('message')
-    
-    if not all([thread_slug, message]):
+    data = request.get_json(cache=True, silent=True) or {}
+    try:
+        thread_slug, message = itemgetter('thread_slug', 'message')(data)
+    except (KeyError, TypeError):
+        return jsonify({"error": "Missing required fields"}), 400
+    if not (thread_slug and message):
         return jsonify({"error": "Missing required fields"}), 400
     
     # Load thread memory
@@ -406,12 +927,12 @@ def elaborate():
     
     response_text = generate_with_gemini(prompt)
     
-    # Update thread memory
-    thread_messages.append({"role": "user", "content": message})
-    thread_messages.append({"role": "assistant", "content": response_text})
-    save_thread_memory(thread_slug, thread_messages)
-    threads[thread_slug] = thread_messages
-    
+    # Update thread memory (append-only)
+    append_thread_messages(thread_slug, [
+        {"role": "user", "content": message},
+        {"role": "assistant", "content": response_text},
+    ])
+
     return jsonify({"textResponse": response_text})
 
 
@@ -419,48 +940,49 @@ def elaborate():
 def inject():
     """
     Inject content into delta index for a project/version.
+    Indexing is batched in the background; the JSONL audit log is written inline.
     Body: { project, version, textContent, metadata? }
-    Returns: 200 OK
+    Returns: 202 Accepted
     """
-    data = request.json
-    project = data.get('project')
-    version = data.get('version')
-    text_content = data.get('textContent')
-    metadata = data.get('metadata', {})
-    
-    if not all([project, version, text_content]):
+    data = request.get_json(cache=True, silent=True) or {}
+    try:
+        project, version, text_content = itemgetter(
+            'project', 'version', 'textContent')(data)
+    except (KeyError, TypeError):
         return jsonify({"error": "Missing required fields"}), 400
-    
+    if not (project and version and text_content):
+        return jsonify({"error": "Missing required fields"}), 400
+    metadata = data.get('metadata', {})
+
     slug = get_slug(project, version)
-    
+
+    # Embedding is the cost center - skip it when this exact content was
+    # already injected for the slug, but still log the call for audit
+    digest = content_hash(text_content)
+    with seen_hashes_lock:
+        slug_hashes = seen_hashes.setdefault(slug, set())
+        duplicate = digest in slug_hashes
+        if not duplicate:
+            slug_hashes.add(digest)
+
     # Append to JSONL
     append_to_jsonl(project, version, text_content, metadata)
-    
-    # Create document
+
+    if duplicate:
+        return jsonify({"status": "duplicate"}), 200
+
+    # Create document and queue it for batched embedding + indexing
     doc = Document(
         text=text_content,
         metadata=metadata,
         doc_id=str(uuid.uuid4())
     )
-    
-    # Update or create delta index
-    delta_index = delta_indexes.get(slug)
-    if delta_index:
-        # Insert into existing index
-        delta_index.insert(doc)
-    else:
-        # Create new delta index
-        delta_index = VectorStoreIndex.from_documents([doc])
-        delta_indexes[slug] = delta_index
-    
-    # Persist delta index
-    delta_path = Path(DELTA_ROOT) / slug
-    delta_path.mkdir(parents=True, exist_ok=True)
-    delta_index.storage_context.persist(persist_dir=str(delta_path))
-    
-    return jsonify({"status": "ok"}), 200
+    injection_batcher.enqueue(slug, doc)
+
+    return jsonify({"status": "accepted"}), 202
 
 
 if __name__ == '__main__':
+    # Dev entry point only - production runs under gunicorn via wsgi.py
     initialize_server()
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
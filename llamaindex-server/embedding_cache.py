@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Query-embedding cache in front of the Gemini embedding model.
+
+Every /v1/answer pays at least one embedding API round-trip for the
+question, and Slack users frequently retry or lightly edit the same
+question within a thread. Caching query embeddings by a digest of the
+normalized text turns those repeats into dictionary lookups. Document/text
+embeddings are not cached - they flow through to the inner model untouched.
+"""
+import hashlib
+import threading
+from typing import Any, List
+
+from cachetools import LRUCache
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+EMBED_CACHE_SIZE = 4096
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Proxy embedding model that memoizes query embeddings."""
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _cache: LRUCache = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+
+    def __init__(self, inner: BaseEmbedding, maxsize: int = EMBED_CACHE_SIZE, **kwargs: Any):
+        super().__init__(
+            model_name=inner.model_name,
+            embed_batch_size=inner.embed_batch_size,
+            **kwargs,
+        )
+        self._inner = inner
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @staticmethod
+    def _key(query: str) -> bytes:
+        return hashlib.blake2b(query.strip().lower().encode(), digest_size=16).digest()
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        key = self._key(query)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        embedding = self._inner.get_query_embedding(query)
+        with self._lock:
+            self._cache[key] = embedding
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        key = self._key(query)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        embedding = await self._inner.aget_query_embedding(query)
+        with self._lock:
+            self._cache[key] = embedding
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._inner.get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return await self._inner.aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        # Preserve the inner model's batched document-embedding path
+        return self._inner._get_text_embeddings(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        # Without this override the BaseEmbedding default degrades the async
+        # path to one _aget_text_embedding call per text
+        return await self._inner._aget_text_embeddings(texts)
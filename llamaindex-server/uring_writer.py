@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Write-behind file writer for hot-path persistence.
+
+Request threads submit writes and get a future back instead of blocking on
+open()+write(). A background worker drains the submissions in batches; when
+the optional ``liburing`` bindings are importable and the kernel is recent
+enough (>= 5.10) the batch is submitted as io_uring SQEs with a single
+io_uring_submit call, otherwise a plain POSIX write is issued per item.
+Either way the request thread stays off the syscall-blocked critical path.
+"""
+import os
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+
+def _kernel_supports_io_uring() -> bool:
+    """io_uring write batching is only worth using on kernels >= 5.10."""
+    try:
+        release = os.uname().release
+        major, minor = release.split(".")[:2]
+        return (int(major), int(minor)) >= (5, 10)
+    except (ValueError, AttributeError):
+        return False
+
+
+try:
+    import liburing  # type: ignore
+    HAVE_LIBURING = _kernel_supports_io_uring()
+except ImportError:
+    liburing = None
+    HAVE_LIBURING = False
+
+
+class UringWriter:
+    """Background file writer batching multiple in-flight writes per submit."""
+
+    def __init__(self, queue_depth: int = 64):
+        self.queue_depth = queue_depth
+        self._queue: "queue.Queue[Tuple[Path, bytes, bool, Future]]" = queue.Queue()
+        self._ring = None
+        if HAVE_LIBURING:
+            try:
+                self._ring = liburing.io_uring()
+                liburing.io_uring_queue_init(queue_depth, self._ring, 0)
+            except Exception as e:
+                print(f"Warning: io_uring setup failed, using POSIX writes: {e}")
+                self._ring = None
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def write(self, path: Union[str, Path], data: bytes, append: bool = False) -> Future:
+        """Submit a write and return a future resolving to the bytes written."""
+        future: Future = Future()
+        self._queue.put((Path(path), data, append, future))
+        return future
+
+    def flush(self):
+        """Block until every write submitted so far has completed."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is already queued, up to the ring depth
+            while len(batch) < self.queue_depth:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if self._ring is not None:
+                    self._write_batch_uring(batch)
+                else:
+                    self._write_batch_posix(batch)
+            except Exception as e:
+                # Keep the worker alive; fail whatever is still unresolved
+                print(f"Warning: background write batch failed: {e}")
+                for _, _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _fail(self, future: Future, path: Path, exc: OSError) -> None:
+        # Callers fire-and-forget the futures, so log here - otherwise a
+        # failed thread-memory or audit-log write would be completely silent
+        print(f"Warning: background write to {path} failed: {exc}")
+        future.set_exception(exc)
+
+    def _open(self, path: Path, append: bool) -> int:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        flags = os.O_WRONLY | os.O_CREAT
+        flags |= os.O_APPEND if append else os.O_TRUNC
+        return os.open(path, flags, 0o644)
+
+    def _write_batch_uring(self, batch: List[Tuple[Path, bytes, bool, Future]]):
+        # Writes to the same file must keep their submission order, but ring
+        # completions are unordered - an append could land before a truncating
+        # write to the same path. Repeated paths take the sequential POSIX
+        # path; only unique paths go through the ring.
+        path_counts = Counter(item[0] for item in batch)
+        serial = [item for item in batch if path_counts[item[0]] > 1]
+        batch = [item for item in batch if path_counts[item[0]] == 1]
+        if serial:
+            self._write_batch_posix(serial)
+
+        # Queue one SQE per write, then submit the whole batch in one syscall.
+        # Completions arrive in arbitrary order, so each SQE carries a
+        # user_data tag that maps its CQE back to the right future.
+        pending = {}  # tag -> (future, fd, data, path)
+        for tag, (path, data, append, future) in enumerate(batch):
+            try:
+                fd = self._open(path, append)
+            except OSError as e:
+                self._fail(future, path, e)
+                continue
+            sqe = liburing.io_uring_get_sqe(self._ring)
+            liburing.io_uring_prep_write(sqe, fd, data, len(data), 0)
+            liburing.io_uring_sqe_set_data64(sqe, tag)
+            pending[tag] = (future, fd, data, path)
+        if not pending:
+            return
+
+        liburing.io_uring_submit(self._ring)
+        cqe = liburing.io_uring_cqe()
+        for _ in range(len(pending)):
+            liburing.io_uring_wait_cqe(self._ring, cqe)
+            tag = cqe.user_data
+            result = cqe.res
+            liburing.io_uring_cqe_seen(self._ring, cqe)
+            entry = pending.pop(tag, None)
+            if entry is None:
+                continue
+            future, fd, data, path = entry
+            try:
+                if result < 0:
+                    self._fail(future, path, OSError(-result, os.strerror(-result)))
+                elif result < len(data):
+                    # Short write: complete the remainder synchronously
+                    written = result
+                    while written < len(data):
+                        written += os.write(fd, data[written:])
+                    future.set_result(written)
+                else:
+                    future.set_result(result)
+            except OSError as e:
+                self._fail(future, path, e)
+            finally:
+                os.close(fd)
+
+    def _write_batch_posix(self, batch: List[Tuple[Path, bytes, bool, Future]]):
+        for path, data, append, future in batch:
+            try:
+                fd = self._open(path, append)
+                try:
+                    written = os.write(fd, data)
+                finally:
+                    os.close(fd)
+                future.set_result(written)
+            except OSError as e:
+                self._fail(future, path, e)
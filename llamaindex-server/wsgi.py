@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for running under gunicorn.
+
+Example:
+    gunicorn -k gthread -w ${GUNICORN_WORKERS:-1} --threads ${GUNICORN_THREADS:-16} \
+        --timeout 120 -b 0.0.0.0:5000 wsgi:app
+"""
+from app import app, initialize_server
+
+initialize_server()